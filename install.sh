@@ -42,6 +42,8 @@ sudo systemctl disable hciuart
 # Скачивание основного скрипта
 echo "Скачивание основного скрипта..."
 wget -O ~/vrx_controller.py https://raw.githubusercontent.com/pavlo8439/vrx_controller/main/vrx_controller.py
+wget -O ~/vrx_protocol.py https://raw.githubusercontent.com/pavlo8439/vrx_controller/main/vrx_protocol.py
+wget -O ~/vrx_state.py https://raw.githubusercontent.com/pavlo8439/vrx_controller/main/vrx_state.py
 
 # Создание службы автозапуска
 echo "Создание службы автозапуска..."
@@ -0,0 +1,117 @@
+import os
+import pty
+import select
+import struct
+import tty
+
+import pytest
+
+pytest.importorskip("serial")
+
+from vrx_protocol import (
+    UART_ACK, UART_NACK, UART_CMD_TUNE, UART_CMD_SCAN, UART_ERR_INTERNAL,
+    UART_ERR_PAYLOAD, UART_ERR_UNKNOWN,
+    UartLink, crc16_ccitt, encode_frame, open_uart, parse_frames,
+)
+
+
+@pytest.fixture
+def station(monkeypatch):
+    """UartLink на подчинённой стороне pty-пары; станция - master."""
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    monkeypatch.setenv("VRX_UART_PORT", os.ttyname(slave))
+    port = open_uart()
+    assert port is not None
+
+    calls = []
+
+    def tune(payload):
+        calls.append(payload)
+        return 0 if len(payload) == 2 else UART_ERR_PAYLOAD
+
+    link = UartLink(port, {UART_CMD_TUNE: tune})
+    yield master, link, calls
+    link.close()
+    os.close(master)
+    os.close(slave)
+
+
+def exchange(master, link, data):
+    """Отправить байты контроллеру, обслужить порт и вернуть его ответы."""
+    os.write(master, data)
+    received = bytearray()
+    for _ in range(20):
+        link.receive()
+        link.transmit()
+        if select.select([master], [], [], 0.02)[0]:
+            received += os.read(master, 4096)
+        elif received and not link.tx_buffer:
+            break
+    return parse_frames(received)
+
+
+def test_crc16_check_value():
+    assert crc16_ccitt(b"123456789") == 0x29B1
+
+
+def test_parse_frames_skips_garbage_and_keeps_tail():
+    frame = encode_frame(UART_CMD_TUNE, 7, b"\x01\x02")
+    buffer = bytearray(b"\x00\xa5junk" + frame + frame[:4])
+    assert parse_frames(buffer) == [(UART_CMD_TUNE, 7, b"\x01\x02")]
+    assert buffer == frame[:4]
+    buffer += frame[4:]
+    assert parse_frames(buffer) == [(UART_CMD_TUNE, 7, b"\x01\x02")]
+    assert buffer == b""
+
+
+def test_round_trip_ack_and_nack(station):
+    master, link, calls = station
+    replies = exchange(master, link, encode_frame(UART_CMD_TUNE, 1, struct.pack("<H", 5800)))
+    assert [(t, p) for t, _, p in replies] == [(UART_ACK, bytes((1, UART_CMD_TUNE)))]
+    assert calls == [struct.pack("<H", 5800)]
+
+    replies = exchange(master, link, encode_frame(UART_CMD_TUNE, 2, b"\x01"))
+    assert [(t, p) for t, _, p in replies] == [
+        (UART_NACK, bytes((2, UART_CMD_TUNE, UART_ERR_PAYLOAD)))]
+
+    replies = exchange(master, link, encode_frame(0x7F, 3))
+    assert [(t, p) for t, _, p in replies] == [
+        (UART_NACK, bytes((3, 0x7F, UART_ERR_UNKNOWN)))]
+
+
+def test_corrupted_frame_is_ignored(station):
+    master, link, calls = station
+    bad = bytearray(encode_frame(UART_CMD_TUNE, 1, struct.pack("<H", 5800)))
+    bad[-1] ^= 0xFF
+    good = encode_frame(UART_CMD_TUNE, 2, struct.pack("<H", 5740))
+    replies = exchange(master, link, bytes(bad) + good)
+    assert [(t, p) for t, _, p in replies] == [(UART_ACK, bytes((2, UART_CMD_TUNE)))]
+    assert calls == [struct.pack("<H", 5740)]
+
+
+def test_repeated_seq_is_replayed_not_executed(station):
+    master, link, calls = station
+    frame = encode_frame(UART_CMD_TUNE, 5, struct.pack("<H", 5800))
+    first = exchange(master, link, frame)
+    second = exchange(master, link, frame)
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_handler_exception_is_nacked_and_next_frame_handled(station):
+    master, link, calls = station
+
+    def broken(payload):
+        raise RuntimeError("boom")
+
+    link.commands[UART_CMD_SCAN] = broken
+    data = (encode_frame(UART_CMD_SCAN, 1, b"\x01") +
+            encode_frame(UART_CMD_TUNE, 2, struct.pack("<H", 5800)))
+    replies = exchange(master, link, data)
+    assert [(t, p) for t, _, p in replies] == [
+        (UART_NACK, bytes((1, UART_CMD_SCAN, UART_ERR_INTERNAL))),
+        (UART_ACK, bytes((2, UART_CMD_TUNE))),
+    ]
+    assert link.last_cmd == (2, UART_CMD_TUNE)
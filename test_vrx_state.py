@@ -0,0 +1,114 @@
+import pytest
+
+from vrx_state import (
+    ControllerState, Rx5808Receiver, StepReceiver, build_tracking_candidates,
+    rx5808_register_word, tracking_vote,
+)
+
+BANDS = [
+    ("A", [5865, 5845, 5825]),
+    ("B", [5733, 5752]),
+    ("C", [5705, 5685, 5665, 5645]),
+]
+
+
+def old_set_rx5808_frequency_bytes(freq_mhz):
+    """Байты, которые писал прежний set_rx5808_frequency (формула Arduino)."""
+    N = int((freq_mhz - 479) / 2)
+    Nhigh = int(N / 32)
+    Nlow = N % 32
+    return (Nlow * 32 + 17, Nhigh * 16 + int(Nlow / 8), int(Nhigh / 16), 0)
+
+
+@pytest.fixture
+def rx():
+    return Rx5808Receiver('VRX1', '5.8GHz', power_pin=2, cs_pin=7,
+                          rssi_channel=0, bands=BANDS)
+
+
+@pytest.mark.parametrize("freq", [4858, 4990, 5362, 5645, 5800, 5917, 6060])
+def test_register_word_matches_old_formula(freq):
+    assert rx5808_register_word(freq) == old_set_rx5808_frequency_bytes(freq)
+
+
+def test_registers_precomputed_for_grid(rx):
+    assert rx.registers == tuple(rx5808_register_word(f) for f in rx.frequencies)
+
+
+def test_flat_index_round_trip(rx):
+    assert len(rx.frequencies) == 9
+    for band_idx, (band_name, freqs) in enumerate(BANDS):
+        assert rx.band_size(band_idx) == len(freqs)
+        for ch_idx, freq in enumerate(freqs):
+            index = rx.index_of(band_idx, ch_idx)
+            rx.select(index)
+            assert (rx.band, rx.channel, rx.frequency) == (band_idx, ch_idx, freq)
+
+
+def test_step_wraps_within_band(rx):
+    rx.select(rx.index_of(1, 1))
+    rx.step('UP')
+    assert (rx.band, rx.channel) == (1, 0)
+    rx.step('DOWN')
+    assert (rx.band, rx.channel) == (1, 1)
+
+
+def test_step_band_wraps_and_resets_channel(rx):
+    rx.select(rx.index_of(2, 3))
+    rx.step_band('UP')
+    assert (rx.band, rx.channel) == (0, 0)
+    rx.step_band('DOWN')
+    assert (rx.band, rx.channel) == (2, 0)
+
+
+def test_snapshot_cached_until_version_changes(rx):
+    first = rx.snapshot()
+    assert rx.snapshot() is first
+    rx.apply_rssi(300)
+    second = rx.snapshot()
+    assert second is not first
+    assert second.rssi_raw == 300
+    rx.step('UP')
+    assert rx.snapshot().frequency == 5845
+
+
+def test_controller_snapshot_shares_unchanged_receivers(rx):
+    other = StepReceiver('VRX2', '1.2GHz', power_pin=3, up_pin=19,
+                         down_pin=26, channels=[1010, 1040])
+    state = ControllerState([rx, other])
+    before = state.snapshot()
+    rx.step('UP')
+    after = state.snapshot()
+    assert after.receivers[1] is before.receivers[1]
+    assert after.receivers[0] is not before.receivers[0]
+    assert after.receivers[0].channel == 1
+
+
+def test_candidates_deduplicated_and_nearest_first():
+    bands = [("A", [5800, 5780, 5820, 5840]), ("B", [5780, 5790, 5800, 5830])]
+    rx = Rx5808Receiver('VRX1', '5.8GHz', power_pin=2, cs_pin=7,
+                        rssi_channel=0, bands=bands)
+    candidates = build_tracking_candidates(rx, 25)
+    # 5780 есть в обоих диапазонах - берётся первый индекс; 5800 - сам захват
+    assert candidates == [(5790, 5), (5780, 1), (5820, 2)]
+    rx.select(rx.index_of(1, 2))
+    assert [f for f, _ in build_tracking_candidates(rx, 25)] == [5790, 5780, 5820]
+
+
+def test_vote_requires_hysteresis():
+    wins = {}
+    assert not tracking_vote(wins, 5800, 59, 50, hysteresis=10, confirm=1)
+    assert wins[5800] == 0
+    assert tracking_vote(wins, 5800, 60, 50, hysteresis=10, confirm=1)
+
+
+def test_vote_requires_consecutive_wins():
+    wins = {}
+    assert not tracking_vote(wins, 5800, 80, 50, hysteresis=10, confirm=2)
+    assert wins[5800] == 1
+    # Проигрыш (или неудачная проба) обнуляет счёт
+    assert not tracking_vote(wins, 5800, None, 50, hysteresis=10, confirm=2)
+    assert wins[5800] == 0
+    assert not tracking_vote(wins, 5800, 80, 50, hysteresis=10, confirm=2)
+    assert tracking_vote(wins, 5800, 80, 50, hysteresis=10, confirm=2)
+    assert wins == {5800: 2}
@@ -3,6 +3,7 @@
 import RPi.GPIO as GPIO
 import time
 import math
+import struct
 import board
 import digitalio
 import threading
@@ -10,6 +11,18 @@ import traceback
 from PIL import Image, ImageDraw, ImageFont
 from adafruit_rgb_display import ili9341
 import spidev  # для SPI (MCP3008 и RX5808)
+from vrx_protocol import (
+    UART_CMD_TUNE, UART_CMD_BAND, UART_CMD_VRX, UART_CMD_SCAN,
+    UART_TLM_RSSI, UART_TLM_STATUS, UART_TLM_SCAN,
+    UART_ERR_PAYLOAD, UART_ERR_RANGE, UART_ERR_STATE,
+    UART_FLAG_AUTOSEARCH, UART_FLAG_TRACKING,
+    UART_RSSI_PER_FRAME, UART_SCAN_PER_FRAME,
+    UartLink, open_uart,
+)
+from vrx_state import (
+    ControllerState, Rx5808Receiver, StepReceiver,
+    build_tracking_candidates, tracking_vote,
+)
 
 # Попробуем импортировать библиотеку для I2C дисплея
 try:
@@ -62,6 +75,10 @@ if I2C_DISPLAY_AVAILABLE:
         traceback.print_exc()
         i2c_display = None
 
+# ========== UART (НАЗЕМНАЯ СТАНЦИЯ) ==========
+# Порт можно переопределить переменной VRX_UART_PORT (например, на pty)
+uart = open_uart()
+
 # ========== НАСТРОЙКА SPI ДЛЯ MCP3008 И RX5808 ==========
 # Создаём объект SPI (используем аппаратный SPI0)
 spi_dev = spidev.SpiDev()
@@ -74,7 +91,6 @@ spi_dev.lsbfirst = True  # для RX5808 нужен LSB first
 # Пины CS для разных устройств
 RX5808_CS_PIN = 7      # GPIO7 (CE1) для модуля RX5808
 MCP3008_CS_PIN = 8     # GPIO8 (CE0) для MCP3008 (если не конфликтует с дисплеем)
-GPIO.setup(RX5808_CS_PIN, GPIO.OUT, initial=GPIO.HIGH)
 GPIO.setup(MCP3008_CS_PIN, GPIO.OUT, initial=GPIO.HIGH)
 
 # ========== КОНФИГУРАЦИЯ VRX ==========
@@ -95,49 +111,26 @@ BANDS_5G = [
     ("N", [5740, 5760, 5780, 5800, 5820, 5840, 5860, 5880])
 ]
 
-VRX_CONFIG = {
-    'VRX1': {
-        'type': '5.8GHz',
-        'power_pin': 2,
-        # Пины управления (CH_UP/CH_DOWN) больше не используются для VRX1,
-        # оставлены для совместимости, но не применяются.
-        'control_pins': {'CH_UP': 6, 'CH_DOWN': 13},
-        'bands': BANDS_5G,          # список кортежей (имя, список частот)
-        'current_band': 0,           # индекс текущего диапазона
-        'current_ch': 0,              # индекс канала в диапазоне
-        'spi_cs': RX5808_CS_PIN,     # пин CS для модуля RX5808
-        'rssi_channel': 0,            # канал MCP3008 для RSSI
-    },
-    'VRX2': {
-        'type': '1.2GHz',
-        'power_pin': 3,
-        'control_pins': {'CH_UP': 19, 'CH_DOWN': 26},
-        'channels': [
-            1010, 1040, 1080, 1120, 1160, 1200, 1240,
-            1280, 1320, 1360, 1258, 1100, 1140
-        ]
-    },
-    'VRX3': {
-        'type': '1.5GHz',
-        'power_pin': 4,
-        'control_pins': {'CH_UP': 21, 'CH_DOWN': 20},
-        'channels': [
-            1405, 1430, 1455, 1480, 1505, 1530, 1555,
-            1580, 1605, 1630, 1655, 1680
-        ]
-    },
-    'VRX4': {
-        'type': '3.3GHz',
-        'power_pin': 17,
-        'control_pins': {'CH_UP': 12, 'CH_DOWN': 5},
-        'channels': [
-            3290, 3310, 3330, 3350, 3370, 3390, 3410, 3430,
-            3450, 3470, 3490, 3510, 3530, 3550, 3570, 3590,
-            3610, 3630, 3650, 3670, 3690, 3710, 3730, 3750,
-            3770, 3790, 3810, 3830, 3850, 3870, 3890, 3910
-        ]
-    }
-}
+# Приёмники в порядке меню. Экземпляров одного типа может быть несколько:
+# каждому RX5808 нужен свой пин CS и канал MCP3008 для RSSI.
+RECEIVERS = [
+    Rx5808Receiver('VRX1', '5.8GHz', power_pin=2,
+                   cs_pin=RX5808_CS_PIN, rssi_channel=0, bands=BANDS_5G),
+    StepReceiver('VRX2', '1.2GHz', power_pin=3, up_pin=19, down_pin=26, channels=[
+        1010, 1040, 1080, 1120, 1160, 1200, 1240,
+        1280, 1320, 1360, 1258, 1100, 1140
+    ]),
+    StepReceiver('VRX3', '1.5GHz', power_pin=4, up_pin=21, down_pin=20, channels=[
+        1405, 1430, 1455, 1480, 1505, 1530, 1555,
+        1580, 1605, 1630, 1655, 1680
+    ]),
+    StepReceiver('VRX4', '3.3GHz', power_pin=17, up_pin=12, down_pin=5, channels=[
+        3290, 3310, 3330, 3350, 3370, 3390, 3410, 3430,
+        3450, 3470, 3490, 3510, 3530, 3550, 3570, 3590,
+        3610, 3630, 3650, 3670, 3690, 3710, 3730, 3750,
+        3770, 3790, 3810, 3830, 3850, 3870, 3890, 3910
+    ]),
+]
 
 # ========== КНОПКИ ==========
 BTN_SELECT = 27
@@ -145,59 +138,63 @@ BTN_UP = 22
 BTN_DOWN = 23
 
 # ========== ГЛОБАЛЬНЫЕ СОСТОЯНИЯ ==========
-current_vrx = 'VRX1'
-app_state = "vrx_select"          # "vrx_select" или "main"
 VERSION = "2.0"                    # обновлённая версия
-active_vrx = None                  # какой VRX сейчас включен
-
-# Состояния каналов для VRX2-4 (оставляем как было)
-channel_states = {
-    'VRX2': {'channel': 0},
-    'VRX3': {'channel': 0},
-    'VRX4': {'channel': 0},
-}
-
-# Для VRX1 храним отдельно
-vrx1_band = 0
-vrx1_channel = 0
-
-# Параметры RSSI
-rssi_raw = 0
-rssi_filtered = 0
-rssi_percent = 0
-rssi_min = 50
-rssi_max = 614
-rssi_buffer = [0]*5
-rssi_buffer_idx = 0
-
-# Автопоиск
-autosearch_active = False
-autosearch_band = 0
-autosearch_ch = 0
-autosearch_best_rssi = -1
-autosearch_best_band = 0
-autosearch_best_ch = 0
-autosearch_total = 0
-autosearch_start_time = 0
-
-# ========== ФУНКЦИИ ДЛЯ РАБОТЫ С VRX1 ==========
-
-def set_rx5808_frequency(freq_mhz):
-    """Установка частоты на модуле RX5808 через SPI."""
-    # Формула: N = (freq - 479) / 2
-    N = (freq_mhz - 479) // 2
-    Nhigh = N >> 5
-    Nlow = N & 0x1F
-    data0 = (Nlow << 5) + 17   # в Arduino: Nlow * 32 + 17 (сдвиг влево на 5)
-    data1 = (Nhigh << 4) + (Nlow >> 3)  # Nhigh*16 + Nlow/8
-    data2 = Nhigh >> 4
-    data3 = 0
-
+state = ControllerState(RECEIVERS)
+autosearch_thread = None           # поток автопоиска (не больше одного)
+
+# Слежение за сигналом (удержание захвата после автопоиска)
+TRACKING_ENABLED = True           # включать слежение после успешного автопоиска
+# Пока захваченный сигнал в порядке, соседей пробуем редко; чаще - только
+# когда уровень ниже порога или заметно упал относительно своего среднего.
+TRACKING_IDLE_INTERVAL = 10.0     # с, пауза между пробами при хорошем сигнале
+TRACKING_PROBE_INTERVAL = 1.0     # с, пауза между пробами при ухудшении сигнала
+TRACKING_RECHECK_DELAY = 0.2      # с, повторная проба кандидата, который оказался сильнее
+TRACKING_DEGRADED_PERCENT = 50    # %, ниже - сигнал считается ухудшившимся
+TRACKING_DROP_PERCENT = 15        # %, падение относительно среднего - тоже ухудшение
+TRACKING_REF_ALPHA = 0.02         # сглаживание среднего уровня (на проход цикла)
+TRACKING_PROBE_SETTLE = 0.015     # с, стабилизация RX5808 после каждой перестройки
+TRACKING_PROBE_SAMPLES = 3        # отсчётов АЦП на одну пробу (сколько успеем до срока)
+# Худший случай пропадания картинки за одну пробу, включая стабилизацию
+# после возврата на захваченную частоту. Вне захваченного канала проба
+# проводит не больше TRACKING_PROBE_MAX - TRACKING_PROBE_SETTLE (не считая
+# задержек планировщика ОС в time.sleep).
+TRACKING_PROBE_MAX = 0.040        # с, не меньше 2 x TRACKING_PROBE_SETTLE + время отсчётов
+# Общий бюджет пропаданий (ведро токенов): в среднем не больше
+# TRACKING_DROPOUT_RATE доли времени, подряд - не больше TRACKING_DROPOUT_BURST.
+# Каждая проба расходует TRACKING_PROBE_MAX; при 0.02 это не чаще одной
+# пробы в 2 с, какие бы интервалы ни стояли выше.
+TRACKING_DROPOUT_RATE = 0.02      # с пропадания на секунду работы
+TRACKING_DROPOUT_BURST = 0.1      # с
+# При ухудшении переход на кандидата k-го по очереди занимает примерно
+# k * TRACKING_PROBE_INTERVAL + (TRACKING_CONFIRM - 1) * TRACKING_RECHECK_DELAY,
+# но не быстрее, чем позволяет бюджет пропаданий.
+TRACKING_NEIGHBOUR_MHZ = 25       # окно поиска соседей вокруг захваченной частоты
+TRACKING_HYSTERESIS = 10          # %, на сколько кандидат должен быть сильнее
+TRACKING_CONFIRM = 2              # сколько проб подряд кандидат должен выигрывать
+
+# Телеметрия наземной станции (протокол - в vrx_protocol.py)
+UART_TELEMETRY_INTERVAL = 0.25    # с, период отправки пакетов телеметрии
+
+uart_last_telemetry = 0
+uart_last_status = None
+uart_rssi_samples = []            # (сырое, фильтр, %) с последней отправки
+uart_scan_results = []            # (диапазон, канал, %) с последней отправки
+
+# ========== ФУНКЦИИ ДЛЯ РАБОТЫ С RX5808 ==========
+
+def write_rx5808(cs_pin, word):
+    """Запись слова регистра в RX5808 через SPI."""
     # Отправка данных по SPI с ручным управлением CS
-    GPIO.output(RX5808_CS_PIN, GPIO.LOW)
-    spi_dev.writebytes([data0, data1, data2, data3])
-    GPIO.output(RX5808_CS_PIN, GPIO.HIGH)
-    # print(f"Установлена частота {freq_mhz} МГц")
+    GPIO.output(cs_pin, GPIO.LOW)
+    spi_dev.writebytes(word)
+    GPIO.output(cs_pin, GPIO.HIGH)
+
+def tune_rx5808(rx, index=None):
+    """Установить частоту RX5808 по индексу сетки (по умолчанию текущему)."""
+    if index is None:
+        index = rx.index
+    write_rx5808(rx.cs_pin, rx.registers[index])
+    return rx.frequencies[index]
 
 def read_mcp3008(channel):
     """Чтение значения с MCP3008 по SPI (канал 0..7)."""
@@ -212,143 +209,188 @@ def read_mcp3008(channel):
     value = ((resp[1] & 3) << 8) + resp[2]
     return value
 
-def apply_rssi_filter(raw):
-    """Комбинированный фильтр (медиана + экспоненциальный)."""
-    global rssi_buffer, rssi_buffer_idx
-    # Медианный фильтр на 5 отсчётов
-    rssi_buffer[rssi_buffer_idx] = raw
-    rssi_buffer_idx = (rssi_buffer_idx + 1) % 5
-    # Сортировка для медианы
-    temp = sorted(rssi_buffer)
-    median = temp[2]
-    # Экспоненциальное сглаживание (alpha = 0.3)
-    global rssi_filtered
-    rssi_filtered = int(0.3 * median + 0.7 * rssi_filtered)
-    return rssi_filtered
-
-def update_rssi():
-    """Обновить значение RSSI (вызывать периодически)."""
-    global rssi_raw, rssi_filtered, rssi_percent, rssi_min, rssi_max
-    raw = read_mcp3008(VRX_CONFIG['VRX1']['rssi_channel'])
-    rssi_raw = raw
-    filtered = apply_rssi_filter(raw)
-    # Автокалибровка min/max (как в Arduino)
-    if not autosearch_active:
-        if filtered < rssi_min and filtered > 0:
-            rssi_min = filtered
-        if filtered > rssi_max and filtered <= 700:
-            rssi_max = filtered
-        if rssi_max - rssi_min < 50:
-            rssi_max = rssi_min + 50
-    if rssi_max > rssi_min:
-        rssi_percent = int((filtered - rssi_min) * 100 / (rssi_max - rssi_min))
-        rssi_percent = max(0, min(100, rssi_percent))
-    else:
-        rssi_percent = 0
-
-def set_vrx1_frequency_by_index(band_idx, ch_idx):
-    """Установить частоту VRX1 по индексам диапазона и канала."""
-    band_name, freqs = VRX_CONFIG['VRX1']['bands'][band_idx]
-    freq = freqs[ch_idx]
-    set_rx5808_frequency(freq)
-    return freq
-
-def vrx1_change_channel(direction):
-    """Изменить канал в текущем диапазоне (UP/DOWN)."""
-    global vrx1_channel, vrx1_band
-    band_name, freqs = VRX_CONFIG['VRX1']['bands'][vrx1_band]
-    if direction == 'UP':
-        vrx1_channel = (vrx1_channel + 1) % len(freqs)
-    else:
-        vrx1_channel = (vrx1_channel - 1) % len(freqs)
-    set_vrx1_frequency_by_index(vrx1_band, vrx1_channel)
+def update_rssi(rx):
+    """Обновить значение RSSI приёмника (вызывать периодически)."""
+    raw = read_mcp3008(rx.rssi_channel)
+    filtered = rx.apply_rssi(raw, calibrate=not state.autosearch_active)
+    if uart:
+        uart_rssi_samples.append((raw, filtered, rx.rssi_percent))
 
-def vrx1_change_band(direction):
-    """Изменить диапазон (UP/DOWN с модификатором SELECT)."""
-    global vrx1_band, vrx1_channel
-    bands = VRX_CONFIG['VRX1']['bands']
-    if direction == 'UP':
-        vrx1_band = (vrx1_band + 1) % len(bands)
-    else:
-        vrx1_band = (vrx1_band - 1) % len(bands)
-    # При смене диапазона сбрасываем канал на первый
-    vrx1_channel = 0
-    set_vrx1_frequency_by_index(vrx1_band, vrx1_channel)
+def rx5808_set_channel(rx, index):
+    """Перейти на заданный канал сетки (ручная настройка)."""
+    stop_tracking()
+    rx.select(index)
+    return tune_rx5808(rx)
 
 def autosearch():
-    """Автоматический поиск лучшего канала (сканирование всех 96)."""
-    global autosearch_active, autosearch_band, autosearch_ch
-    global autosearch_best_rssi, autosearch_best_band, autosearch_best_ch
-    global autosearch_total, autosearch_start_time, rssi_percent
-
-    if current_vrx != 'VRX1':
+    """Автоматический поиск лучшего канала (сканирование всей сетки)."""
+    rx_index = state.current
+    rx = state.receivers[rx_index]
+    if not isinstance(rx, Rx5808Receiver):
+        state.autosearch_active = False
         return
 
-    autosearch_active = True
-    autosearch_band = 0
-    autosearch_ch = 0
-    autosearch_best_rssi = -1
-    autosearch_best_band = 0
-    autosearch_best_ch = 0
-    autosearch_total = 0
-    autosearch_start_time = time.time()
-
-    # Массив для хранения средних RSSI по каждому каналу
-    rssi_averages = [0] * 96
+    # autosearch_active уже выставлен в start_autosearch()
+    stop_tracking()
+    state.autosearch_best_rssi = -1
+    state.autosearch_best_index = 0
+    state.autosearch_total = 0
+    state.autosearch_start_time = time.time()
+
     measurements_per_channel = 20
-    channel_measure_count = 0
 
     print("Автопоиск запущен")
     update_display()
 
     # Перебираем все каналы
-    for band_idx, (band_name, freqs) in enumerate(VRX_CONFIG['VRX1']['bands']):
-        for ch_idx in range(len(freqs)):
-            if not autosearch_active:  # прерывание по кнопке
-                break
-            # Устанавливаем частоту
-            set_vrx1_frequency_by_index(band_idx, ch_idx)
-            time.sleep(0.2)  # ждём стабилизации
-
-            # Измеряем RSSI несколько раз
-            total = 0
-            for _ in range(measurements_per_channel):
-                update_rssi()
-                total += rssi_filtered
-                time.sleep(0.05)
-            avg = total // measurements_per_channel
-            idx = band_idx * 8 + ch_idx
-            rssi_averages[idx] = avg
-
-            # Конвертируем в проценты
-            if rssi_max > rssi_min:
-                percent = int((avg - rssi_min) * 100 / (rssi_max - rssi_min))
-                percent = max(0, min(100, percent))
-            else:
-                percent = 0
-
-            # Проверка на лучший
-            if percent >= 25 and percent > autosearch_best_rssi:
-                autosearch_best_rssi = percent
-                autosearch_best_band = band_idx
-                autosearch_best_ch = ch_idx
-                print(f"Новый лучший: диапазон {band_name}, канал {ch_idx+1}, RSSI {percent}%")
-
-            autosearch_total += 1
-            update_display()
+    for index in range(len(rx.frequencies)):
+        if not state.autosearch_active:  # прерывание по кнопке
+            break
+        # Устанавливаем частоту
+        tune_rx5808(rx, index)
+        time.sleep(0.2)  # ждём стабилизации
+
+        # Измеряем RSSI несколько раз
+        total = 0
+        for _ in range(measurements_per_channel):
+            update_rssi(rx)
+            total += rx.rssi_filtered
+            time.sleep(0.05)
+        avg = total // measurements_per_channel
+
+        # Конвертируем в проценты
+        percent = rx.rssi_to_percent(avg)
+        band_idx = rx.band_of[index]
+        ch_idx = rx.channel_of[index]
+        if uart:
+            uart_scan_results.append((band_idx, ch_idx, percent))
+
+        # Проверка на лучший
+        if percent >= 25 and percent > state.autosearch_best_rssi:
+            state.autosearch_best_rssi = percent
+            state.autosearch_best_index = index
+            print(f"Новый лучший: диапазон {rx.band_names[band_idx]}, канал {ch_idx+1}, RSSI {percent}%")
+
+        state.autosearch_total += 1
+        update_display()
 
-    # Завершение
-    autosearch_active = False
-    if autosearch_best_rssi >= 25:
+    # Завершение. Поиск прерван кнопкой, командой или выходом в меню -
+    # результат не применяем
+    aborted = not state.autosearch_active
+    state.autosearch_active = False
+    if aborted or state.app_state != "main" or state.active != rx_index:
+        tune_rx5808(rx)
+        print("Автопоиск прерван")
+    elif state.autosearch_best_rssi >= 25:
         # Устанавливаем лучший канал
-        vrx1_band = autosearch_best_band
-        vrx1_channel = autosearch_best_ch
-        set_vrx1_frequency_by_index(vrx1_band, vrx1_channel)
-        print(f"Автопоиск завершён. Лучший: диапазон {VRX_CONFIG['VRX1']['bands'][vrx1_band][0]}, канал {vrx1_channel+1}, RSSI {autosearch_best_rssi}%")
+        rx.select(state.autosearch_best_index)
+        tune_rx5808(rx)
+        print(f"Автопоиск завершён. Лучший: диапазон {rx.band_names[rx.band]}, канал {rx.channel+1}, RSSI {state.autosearch_best_rssi}%")
+        if TRACKING_ENABLED:
+            start_tracking(rx)
     else:
+        # Возвращаемся на канал, который был до поиска
+        tune_rx5808(rx)
         print("Автопоиск завершён: сигнал не найден")
     update_display()
 
+# ========== СЛЕЖЕНИЕ ЗА СИГНАЛОМ RX5808 ==========
+
+def start_tracking(rx):
+    """Включить слежение за текущим каналом приёмника rx."""
+    state.tracking_receiver = state.receivers.index(rx)
+    state.tracking_candidates = build_tracking_candidates(rx, TRACKING_NEIGHBOUR_MHZ)
+    state.tracking_probe_idx = 0
+    state.tracking_last_probe = time.time()
+    state.tracking_wins = {}
+    state.tracking_ref_percent = rx.rssi_percent
+    if not state.tracking_active:
+        # Бюджет не пополняем при переходе между каналами слежения
+        state.tracking_budget = TRACKING_DROPOUT_BURST
+        state.tracking_budget_time = time.time()
+    state.tracking_active = bool(state.tracking_candidates)
+    if state.tracking_active:
+        print(f"Слежение включено: {len(state.tracking_candidates)} соседних частот")
+
+def stop_tracking():
+    """Выключить слежение (ручная смена канала, автопоиск, выход в меню)."""
+    if state.tracking_active:
+        print("Слежение выключено")
+    state.tracking_active = False
+
+def probe_frequency(rx, index):
+    """Кратковременно перестроить RX5808 на канал index и измерить RSSI.
+
+    Отсчёты снимаются, пока не выйдет срок TRACKING_PROBE_MAX за вычетом
+    стабилизации после возврата. Возвращает медиану отсчётов или None, если
+    ни одного отсчёта снять не успели. Захваченная частота восстанавливается
+    всегда.
+    """
+    deadline = time.time() + TRACKING_PROBE_MAX - TRACKING_PROBE_SETTLE
+    samples = []
+    try:
+        write_rx5808(rx.cs_pin, rx.registers[index])
+        time.sleep(TRACKING_PROBE_SETTLE)
+        while len(samples) < TRACKING_PROBE_SAMPLES and time.time() < deadline:
+            samples.append(read_mcp3008(rx.rssi_channel))
+    finally:
+        write_rx5808(rx.cs_pin, rx.registers[rx.index])
+    if not samples:
+        return None
+    samples.sort()
+    return samples[len(samples) // 2]
+
+def tracking_step(rx):
+    """Одна проба соседней частоты по расписанию (вызывать из основного цикла)."""
+    if (not state.tracking_active or state.autosearch_active
+            or state.app_state != "main"
+            or state.receivers[state.tracking_receiver] is not rx):
+        return
+    now = time.time()
+    percent = rx.rssi_percent
+    state.tracking_ref_percent += TRACKING_REF_ALPHA * (percent - state.tracking_ref_percent)
+    degraded = (percent < TRACKING_DEGRADED_PERCENT
+                or percent < state.tracking_ref_percent - TRACKING_DROP_PERCENT)
+
+    candidates = state.tracking_candidates
+    freq, index = candidates[state.tracking_probe_idx]
+    if state.tracking_wins.get(freq):
+        # Лидера перепроверяем сразу, не дожидаясь полного круга
+        interval = TRACKING_RECHECK_DELAY
+    elif degraded:
+        interval = TRACKING_PROBE_INTERVAL
+    else:
+        interval = TRACKING_IDLE_INTERVAL
+    if now - state.tracking_last_probe < interval:
+        return
+
+    # Бюджет пропаданий: пополняется со временем, проба его расходует
+    state.tracking_budget = min(
+        TRACKING_DROPOUT_BURST,
+        state.tracking_budget + (now - state.tracking_budget_time) * TRACKING_DROPOUT_RATE)
+    state.tracking_budget_time = now
+    if state.tracking_budget < TRACKING_PROBE_MAX:
+        return
+    state.tracking_budget -= TRACKING_PROBE_MAX
+    state.tracking_last_probe = now
+    raw = probe_frequency(rx, index)
+
+    # Гистерезис: кандидат должен стабильно превосходить захваченный канал
+    probe_percent = rx.rssi_to_percent(raw) if raw is not None else None
+    if not tracking_vote(state.tracking_wins, freq, probe_percent, rx.rssi_percent,
+                         TRACKING_HYSTERESIS, TRACKING_CONFIRM):
+        if not state.tracking_wins[freq]:
+            state.tracking_probe_idx = (state.tracking_probe_idx + 1) % len(candidates)
+        return
+
+    rx.select(index)
+    tune_rx5808(rx)
+    # Засеваем фильтр значением пробы, чтобы не тянуть хвост старого канала
+    rx.seed_rssi(raw)
+    print(f"Слежение: переход на {rx.band_names[rx.band]}{rx.channel+1} ({freq} МГц)")
+    start_tracking(rx)
+    update_display()
+
 # ========== ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ ДЛЯ ДИСПЛЕЯ ==========
 
 def get_display_dimensions():
@@ -361,7 +403,7 @@ def create_display_image():
     width, height = get_display_dimensions()
     return Image.new("RGB", (width, height)), width, height
 
-def update_i2c_display():
+def update_i2c_display(snap):
     if not i2c_display:
         return
     try:
@@ -369,24 +411,25 @@ def update_i2c_display():
         draw = ImageDraw.Draw(image)
         draw.rectangle((0, 0, i2c_display.width, i2c_display.height), outline=0, fill=0)
         font = ImageFont.load_default()
-        if app_state == "main" and current_vrx == "VRX1":
-            band_name, freqs = VRX_CONFIG['VRX1']['bands'][vrx1_band]
-            freq = freqs[vrx1_channel]
-            draw.text((0, 0), f"VRX1 {band_name}", font=font, fill=255)
-            draw.text((0, 16), f"{freq} MHz", font=font, fill=255)
-            draw.text((0, 32), f"RSSI: {rssi_percent}%", font=font, fill=255)
-            if autosearch_active:
+        rx = snap.receivers[snap.current]
+        if snap.app_state == "main" and rx.band is not None:
+            draw.text((0, 0), f"{rx.name} {rx.band_name}", font=font, fill=255)
+            draw.text((0, 16), f"{rx.frequency} MHz", font=font, fill=255)
+            draw.text((0, 32), f"RSSI: {rx.rssi_percent}%", font=font, fill=255)
+            if snap.autosearch_active:
                 draw.text((0, 48), "AUTO SEARCH", font=font, fill=255)
+            elif snap.tracking_active:
+                draw.text((0, 48), "TRACKING", font=font, fill=255)
         else:
             draw.text((0, 0), "VRX System", font=font, fill=255)
-            draw.text((0, 16), "Select VRX1", font=font, fill=255)
+            draw.text((0, 16), "Select 5.8GHz VRX", font=font, fill=255)
             draw.text((0, 32), "for I2C display", font=font, fill=255)
         i2c_display.image(image)
         i2c_display.show()
     except Exception as e:
         print(f"Ошибка I2C дисплея: {e}")
 
-def show_vrx_selection():
+def show_vrx_selection(snap):
     try:
         image, width, height = create_display_image()
         draw = ImageDraw.Draw(image)
@@ -402,12 +445,26 @@ def show_vrx_selection():
         title_width = draw.textlength(title, font=font_large)
         draw.text((width//2 - title_width//2, 10), title, font=font_large, fill=(255, 0, 0))
 
-        y_pos = 60
-        for i, vrx in enumerate(VRX_CONFIG.keys()):
-            color = (0, 255, 0) if vrx == current_vrx else (255, 255, 255)
-            text = f"{vrx} ({VRX_CONFIG[vrx]['type']})"
+        # Список прокручивается: видно столько строк, сколько помещается
+        # между заголовком и подсказкой, выбранная - по возможности в середине
+        row_height = 30
+        list_top = 60
+        count = len(snap.receivers)
+        visible = max(1, (height - 30 - list_top) // row_height)
+        first = min(max(0, snap.current - visible // 2), max(0, count - visible))
+        y_pos = list_top
+        for i in range(first, min(count, first + visible)):
+            rx = snap.receivers[i]
+            color = (0, 255, 0) if i == snap.current else (255, 255, 255)
+            text = f"{rx.name} ({rx.type})"
             draw.text((width//2 - 100, y_pos), text, font=font_medium, fill=color)
-            y_pos += 30
+            y_pos += row_height
+        # Стрелки, если выше или ниже есть скрытые приёмники
+        if first > 0:
+            draw.text((width - 30, list_top), "▲", font=font_medium, fill=(200, 200, 200))
+        if first + visible < count:
+            draw.text((width - 30, list_top + (visible - 1) * row_height), "▼",
+                      font=font_medium, fill=(200, 200, 200))
 
         instr = "SELECT: выбрать  UP/DOWN: переключение"
         instr_width = draw.textlength(instr, font=font_small)
@@ -416,9 +473,9 @@ def show_vrx_selection():
         disp.image(image)
     except Exception as e:
         print(f"Ошибка отображения выбора VRX: {e}")
-    update_i2c_display()
+    update_i2c_display(snap)
 
-def show_main_screen():
+def show_main_screen(snap):
     try:
         image, width, height = create_display_image()
         draw = ImageDraw.Draw(image)
@@ -431,48 +488,45 @@ def show_main_screen():
             font_large = font_medium = font_small = ImageFont.load_default()
 
         # Заголовок
-        vrx_type = VRX_CONFIG[current_vrx]['type']
-        title = f"{current_vrx} ({vrx_type})"
+        rx = snap.receivers[snap.current]
+        title = f"{rx.name} ({rx.type})"
         title_width = draw.textlength(title, font=font_large)
         draw.text((width//2 - title_width//2, 10), title, font=font_large, fill=(255, 0, 0))
 
-        if current_vrx == 'VRX1':
-            # Отображение для VRX1
-            band_name, freqs = VRX_CONFIG['VRX1']['bands'][vrx1_band]
-            freq = freqs[vrx1_channel]
+        if rx.band is not None:
+            # Отображение для RX5808
             # Частота
-            freq_text = f"{freq} МГц"
+            freq_text = f"{rx.frequency} МГц"
             freq_width = draw.textlength(freq_text, font=font_medium)
             draw.text((width//2 - freq_width//2, 50), freq_text, font=font_medium, fill=(255,255,255))
             # Диапазон и канал
-            band_ch_text = f"Диапазон {band_name}  Канал {vrx1_channel+1}/8"
+            band_ch_text = f"Диапазон {rx.band_name}  Канал {rx.channel+1}/{rx.channel_count}"
             band_ch_width = draw.textlength(band_ch_text, font=font_small)
             draw.text((width//2 - band_ch_width//2, 90), band_ch_text, font=font_small, fill=(255,255,255))
             # RSSI
-            rssi_text = f"RSSI: {rssi_percent}%"
+            rssi_text = f"RSSI: {rx.rssi_percent}%"
             rssi_width = draw.textlength(rssi_text, font=font_small)
             draw.text((width//2 - rssi_width//2, 120), rssi_text, font=font_small, fill=(255,255,255))
             # Полоска RSSI
-            bar_len = int(rssi_percent * 1.5)  # максимум 150 пикселей
+            bar_len = int(rx.rssi_percent * 1.5)  # максимум 150 пикселей
             draw.rectangle((width//2 - 75, 140, width//2 - 75 + bar_len, 150), fill=(0,255,0))
             # Статус автопоиска
-            if autosearch_active:
+            if snap.autosearch_active:
                 search_text = "АВТОПОИСК АКТИВЕН"
                 search_width = draw.textlength(search_text, font=font_small)
                 draw.text((width//2 - search_width//2, 160), search_text, font=font_small, fill=(255,0,0))
+            elif snap.tracking_active:
+                track_text = "СЛЕЖЕНИЕ"
+                track_width = draw.textlength(track_text, font=font_small)
+                draw.text((width//2 - track_width//2, 160), track_text, font=font_small, fill=(0,255,0))
             # Подсказки
             instr = "UP/DOWN: канал  SEL+UP/DOWN: диапазон  HOLD SEL: автопоиск"
         else:
-            # Для VRX2-4 (старая логика)
-            config = VRX_CONFIG[current_vrx]
-            state = channel_states[current_vrx]
-            if state['channel'] >= len(config['channels']):
-                state['channel'] = len(config['channels']) - 1
-            freq = config['channels'][state['channel']]
-            freq_text = f"Частота: {freq} МГц"
+            # Для приёмников с кнопочным переключением
+            freq_text = f"Частота: {rx.frequency} МГц"
             freq_width = draw.textlength(freq_text, font=font_medium)
             draw.text((width//2 - freq_width//2, 50), freq_text, font=font_medium, fill=(255,255,255))
-            channel_text = f"Канал: {state['channel']+1}/{len(config['channels'])}"
+            channel_text = f"Канал: {rx.channel+1}/{rx.channel_count}"
             channel_width = draw.textlength(channel_text, font=font_small)
             draw.text((width//2 - channel_width//2, 90), channel_text, font=font_small, fill=(255,255,255))
             instr = "UP: канал+  DOWN: канал-  SELECT: меню"
@@ -497,58 +551,49 @@ def show_main_screen():
             disp.image(image)
         except:
             pass
-    update_i2c_display()
+    update_i2c_display(snap)
 
 def update_display():
-    if app_state == "vrx_select":
-        show_vrx_selection()
-    elif app_state == "main":
-        show_main_screen()
+    # Рисуем по снимку: автопоиск в другом потоке не меняет данные на ходу
+    snap = state.snapshot()
+    if snap.app_state == "vrx_select":
+        show_vrx_selection(snap)
+    elif snap.app_state == "main":
+        show_main_screen(snap)
 
 # ========== УПРАВЛЕНИЕ ПИТАНИЕМ И КАНАЛАМИ (ДЛЯ ВСЕХ VRX) ==========
 
-def set_vrx_power(vrx, power_on):
-    config = VRX_CONFIG[vrx]
-    GPIO.output(config['power_pin'], GPIO.LOW if power_on else GPIO.HIGH)
+def set_vrx_power(rx, power_on):
+    GPIO.output(rx.power_pin, GPIO.LOW if power_on else GPIO.HIGH)
     status = "ВКЛ" if power_on else "ВЫКЛ"
-    print(f"{vrx} питание: {status}")
-
-def reset_vrx_channels(vrx):
-    if vrx == 'VRX1':
-        # Для VRX1 сброс не требуется, но можно вернуть на первый диапазон/канал
-        global vrx1_band, vrx1_channel
-        vrx1_band = 0
-        vrx1_channel = 0
-    else:
-        channel_states[vrx]['channel'] = 0
+    print(f"{rx.name} питание: {status}")
+
+def reset_vrx_channels(rx):
+    if isinstance(rx, Rx5808Receiver):
+        # Для RX5808 сброс не требуется, но можно вернуть на первый диапазон/канал
+        stop_tracking()
+    rx.reset()
 
 def change_channel(direction):
     """Изменение канала для текущего VRX."""
-    global vrx1_band, vrx1_channel
-    if current_vrx == 'VRX1':
-        vrx1_change_channel(direction)
+    rx = state.receiver
+    if isinstance(rx, Rx5808Receiver):
+        stop_tracking()
+        rx.step(direction)
+        tune_rx5808(rx)
     else:
-        state = channel_states[current_vrx]
-        config = VRX_CONFIG[current_vrx]
-        if direction == 'UP':
-            state['channel'] = (state['channel'] + 1) % len(config['channels'])
-            press_button(config['control_pins']['CH_UP'])
-        else:
-            state['channel'] = (state['channel'] - 1) % len(config['channels'])
-            press_button(config['control_pins']['CH_DOWN'])
-        # Обеспечение границ
-        if state['channel'] < 0:
-            state['channel'] = 0
-        if state['channel'] >= len(config['channels']):
-            state['channel'] = len(config['channels']) - 1
-        freq = config['channels'][state['channel']]
-        print(f"{current_vrx}: Канал {state['channel']+1}, Частота {freq} МГц")
+        rx.step(direction)
+        press_button(rx.up_pin if direction == 'UP' else rx.down_pin)
+        print(f"{rx.name}: Канал {rx.index+1}, Частота {rx.frequency} МГц")
     update_display()
 
 def change_band(direction):
-    """Изменение диапазона для VRX1 (только)."""
-    if current_vrx == 'VRX1':
-        vrx1_change_band(direction)
+    """Изменение диапазона (только для RX5808)."""
+    rx = state.receiver
+    if isinstance(rx, Rx5808Receiver):
+        stop_tracking()
+        rx.step_band(direction)
+        tune_rx5808(rx)
         update_display()
 
 def press_button(pin, duration=0.1):
@@ -560,15 +605,17 @@ def press_button(pin, duration=0.1):
 
 def setup_gpio():
     # Пины питания VRX
-    for vrx, config in VRX_CONFIG.items():
-        GPIO.setup(config['power_pin'], GPIO.OUT)
-        GPIO.output(config['power_pin'], GPIO.HIGH)  # изначально выкл
-        print(f"{vrx} питание: пин {config['power_pin']} = HIGH")
-
-    # Управляющие пины для VRX2-4
-    for vrx, config in VRX_CONFIG.items():
-        if vrx != 'VRX1':  # для VRX1 они не используются, но на всякий случай настроим
-            for pin in config['control_pins'].values():
+    for rx in state.receivers:
+        GPIO.setup(rx.power_pin, GPIO.OUT)
+        GPIO.output(rx.power_pin, GPIO.HIGH)  # изначально выкл
+        print(f"{rx.name} питание: пин {rx.power_pin} = HIGH")
+
+    # Управляющие пины: CS для RX5808, CH_UP/CH_DOWN для остальных
+    for rx in state.receivers:
+        if isinstance(rx, Rx5808Receiver):
+            GPIO.setup(rx.cs_pin, GPIO.OUT, initial=GPIO.HIGH)
+        else:
+            for pin in (rx.up_pin, rx.down_pin):
                 GPIO.setup(pin, GPIO.OUT)
                 GPIO.output(pin, GPIO.HIGH)
 
@@ -577,21 +624,174 @@ def setup_gpio():
     GPIO.setup(BTN_UP, GPIO.IN, pull_up_down=GPIO.PUD_UP)
     GPIO.setup(BTN_DOWN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
+# ========== ПЕРЕКЛЮЧЕНИЕ VRX ==========
+
+def enter_vrx():
+    """Включить выбранный VRX и перейти на основной экран."""
+    rx = state.receiver
+    set_vrx_power(rx, True)
+    if isinstance(rx, Rx5808Receiver):
+        # После выключения индекс сброшен - частоту модуля приводим к нему
+        tune_rx5808(rx)
+    state.active = state.current
+    state.app_state = "main"
+    update_display()
+
+def leave_vrx():
+    """Выключить текущий VRX и вернуться в меню выбора."""
+    # Прерываем автопоиск: результат выключенного приёмника не нужен
+    state.autosearch_active = False
+    if state.active is not None:
+        rx = state.receivers[state.active]
+        set_vrx_power(rx, False)
+        reset_vrx_channels(rx)
+        state.active = None
+    state.app_state = "vrx_select"
+    update_display()
+
+def start_autosearch():
+    """Запустить автопоиск в отдельном потоке.
+
+    Возвращает False, если предыдущий поток ещё работает (в том числе
+    после прерывания, пока он не вышел из цикла по каналу).
+    """
+    global autosearch_thread
+    if autosearch_thread is not None and autosearch_thread.is_alive():
+        return False
+    # Флаг ставим до запуска потока, чтобы повторный вызов его увидел
+    state.autosearch_active = True
+    autosearch_thread = threading.Thread(target=autosearch, daemon=True)
+    autosearch_thread.start()
+    return True
+
+# ========== UART-ПРОТОКОЛ ==========
+
+def uart_cmd_tune(payload):
+    if len(payload) != 2:
+        return UART_ERR_PAYLOAD
+    rx = state.receiver
+    if (state.app_state != "main" or not isinstance(rx, Rx5808Receiver)
+            or state.autosearch_active):
+        return UART_ERR_STATE
+    (freq,) = struct.unpack('<H', payload)
+    if freq not in rx.frequencies:
+        return UART_ERR_RANGE
+    rx5808_set_channel(rx, rx.frequencies.index(freq))
+    update_display()
+    return 0
+
+def uart_cmd_band(payload):
+    if len(payload) != 2:
+        return UART_ERR_PAYLOAD
+    rx = state.receiver
+    if (state.app_state != "main" or not isinstance(rx, Rx5808Receiver)
+            or state.autosearch_active):
+        return UART_ERR_STATE
+    band_idx, ch_idx = payload
+    if band_idx >= len(rx.band_names) or ch_idx >= rx.band_size(band_idx):
+        return UART_ERR_RANGE
+    rx5808_set_channel(rx, rx.index_of(band_idx, ch_idx))
+    update_display()
+    return 0
+
+def uart_cmd_vrx(payload):
+    if len(payload) != 1:
+        return UART_ERR_PAYLOAD
+    if state.autosearch_active:
+        return UART_ERR_STATE
+    index = payload[0]
+    if index == 0xFF:
+        leave_vrx()
+        return 0
+    if index >= len(state.receivers):
+        return UART_ERR_RANGE
+    if state.app_state == "main":
+        leave_vrx()
+    state.current = index
+    enter_vrx()
+    return 0
+
+def uart_cmd_scan(payload):
+    if len(payload) != 1:
+        return UART_ERR_PAYLOAD
+    if payload[0]:
+        if state.app_state != "main" or not isinstance(state.receiver, Rx5808Receiver):
+            return UART_ERR_STATE
+        if not start_autosearch():
+            return UART_ERR_STATE
+    else:
+        state.autosearch_active = False
+    return 0
+
+UART_COMMANDS = {
+    UART_CMD_TUNE: uart_cmd_tune,
+    UART_CMD_BAND: uart_cmd_band,
+    UART_CMD_VRX: uart_cmd_vrx,
+    UART_CMD_SCAN: uart_cmd_scan,
+}
+
+uart_link = UartLink(uart, UART_COMMANDS) if uart else None
+
+def uart_status_payload(snap):
+    vrx_index = snap.active if snap.active is not None else 0xFF
+    rx = snap.receivers[snap.current]
+    band_idx = rx.band if rx.band is not None else 0xFF
+    flags = 0
+    if snap.autosearch_active:
+        flags |= UART_FLAG_AUTOSEARCH
+    if snap.tracking_active:
+        flags |= UART_FLAG_TRACKING
+    return struct.pack('<BBBHB', vrx_index, band_idx, rx.channel, rx.frequency, flags)
+
+def uart_flush_telemetry():
+    """Отправить накопленные отсчёты RSSI и результаты сканирования пакетами."""
+    global uart_rssi_samples, uart_scan_results, uart_last_status
+    samples, uart_rssi_samples = uart_rssi_samples, []
+    for i in range(0, len(samples), UART_RSSI_PER_FRAME):
+        chunk = samples[i:i + UART_RSSI_PER_FRAME]
+        uart_link.send(UART_TLM_RSSI, bytes((len(chunk),)) +
+                  b''.join(struct.pack('<HHB', *sample) for sample in chunk))
+    results, uart_scan_results = uart_scan_results, []
+    for i in range(0, len(results), UART_SCAN_PER_FRAME):
+        chunk = results[i:i + UART_SCAN_PER_FRAME]
+        uart_link.send(UART_TLM_SCAN, bytes((len(chunk),)) +
+                  b''.join(bytes(result) for result in chunk))
+    # Статус отправляем только при изменении
+    status = uart_status_payload(state.snapshot())
+    if status != uart_last_status:
+        uart_link.send(UART_TLM_STATUS, status)
+        uart_last_status = status
+
+def uart_poll():
+    """Обслуживание UART за один проход основного цикла, без блокировок."""
+    global uart_last_telemetry
+    if not uart_link:
+        return
+    try:
+        uart_link.receive()
+
+        now = time.time()
+        if now - uart_last_telemetry >= UART_TELEMETRY_INTERVAL:
+            uart_last_telemetry = now
+            uart_flush_telemetry()
+
+        uart_link.transmit()
+    except Exception as e:
+        print(f"Ошибка UART: {e}")
+
 # ========== ОСНОВНОЙ ЦИКЛ ==========
 
 def main():
-    global app_state, current_vrx, active_vrx
-    global vrx1_band, vrx1_channel
-    global autosearch_active
-
     print("Запуск системы управления VRX (версия с улучшенным VRX1)...")
     setup_gpio()
 
-    # Инициализация VRX1: устанавливаем первую частоту
-    set_vrx1_frequency_by_index(0, 0)
+    # Инициализация RX5808: устанавливаем первую частоту
+    for rx in state.receivers:
+        if isinstance(rx, Rx5808Receiver):
+            tune_rx5808(rx)
 
     # Начинаем с экрана выбора
-    app_state = "vrx_select"
+    state.app_state = "vrx_select"
     update_display()
 
     # Переменные для обработки кнопок
@@ -605,9 +805,13 @@ def main():
     try:
         while True:
             now = time.time()
-            # Обновление RSSI для VRX1 (если он активен или в фоне)
-            if current_vrx == 'VRX1' or autosearch_active:
-                update_rssi()
+            rx = state.receiver
+            is_rx5808 = isinstance(rx, Rx5808Receiver)
+            # Обновление RSSI для RX5808 (если он выбран)
+            if is_rx5808:
+                update_rssi(rx)
+                # Пробы соседних частот в коротких паузах
+                tracking_step(rx)
 
             # Чтение кнопок
             select = GPIO.input(BTN_SELECT)
@@ -623,38 +827,28 @@ def main():
                 else:  # отпущена
                     press_duration = now - select_press_time
                     if not select_hold_triggered:
-                        if press_duration > 2.0 and app_state == "main" and current_vrx == 'VRX1':
+                        if press_duration > 2.0 and state.app_state == "main" and is_rx5808:
                             # Долгое нажатие без модификатора -> автопоиск
-                            if not autosearch_active:
-                                autosearch_thread = threading.Thread(target=autosearch, daemon=True)
-                                autosearch_thread.start()
+                            start_autosearch()
                             select_hold_triggered = True
                         elif press_duration > 0.1 and not select_hold_triggered:
                             # Короткое нажатие
-                            if app_state == "vrx_select":
+                            if state.app_state == "vrx_select":
                                 # Включаем выбранный VRX
-                                set_vrx_power(current_vrx, True)
-                                active_vrx = current_vrx
-                                app_state = "main"
-                                update_display()
-                            elif app_state == "main":
+                                enter_vrx()
+                            elif state.app_state == "main":
                                 # Выключаем текущий VRX и возвращаемся в меню
-                                if active_vrx:
-                                    set_vrx_power(active_vrx, False)
-                                    reset_vrx_channels(active_vrx)
-                                    active_vrx = None
-                                app_state = "vrx_select"
-                                update_display()
+                                leave_vrx()
                     select_held = False
                 last_select = select
 
-            # Обработка UP/DOWN с учётом модификатора SELECT для VRX1
+            # Обработка UP/DOWN с учётом модификатора SELECT для RX5808
             if up != last_up:
                 if up == GPIO.LOW:
-                    if app_state == "vrx_select":
+                    if state.app_state == "vrx_select":
                         change_vrx('UP')
-                    elif app_state == "main":
-                        if current_vrx == 'VRX1' and select_held and not select_hold_triggered:
+                    elif state.app_state == "main":
+                        if is_rx5808 and select_held and not select_hold_triggered:
                             # Удержание SELECT + UP -> смена диапазона
                             change_band('UP')
                             select_hold_triggered = True  # предотвращаем автопоиск
@@ -664,18 +858,21 @@ def main():
 
             if down != last_down:
                 if down == GPIO.LOW:
-                    if app_state == "vrx_select":
+                    if state.app_state == "vrx_select":
                         change_vrx('DOWN')
-                    elif app_state == "main":
-                        if current_vrx == 'VRX1' and select_held and not select_hold_triggered:
+                    elif state.app_state == "main":
+                        if is_rx5808 and select_held and not select_hold_triggered:
                             change_band('DOWN')
                             select_hold_triggered = True
                         else:
                             change_channel('DOWN')
                 last_down = down
 
+            # Команды и телеметрия наземной станции
+            uart_poll()
+
             # Автоматическое обновление дисплея во время автопоиска
-            if autosearch_active:
+            if state.autosearch_active:
                 # Обновляем чаще
                 time.sleep(0.1)
                 update_display()
@@ -689,22 +886,20 @@ def main():
         traceback.print_exc()
     finally:
         # Выключаем все VRX
-        for vrx in VRX_CONFIG:
-            set_vrx_power(vrx, False)
-            reset_vrx_channels(vrx)
+        for rx in state.receivers:
+            set_vrx_power(rx, False)
+            reset_vrx_channels(rx)
         GPIO.cleanup()
         spi_dev.close()
+        if uart_link:
+            uart_link.close()
         print("Ресурсы освобождены")
 
 def change_vrx(direction):
-    global current_vrx
-    vrx_list = list(VRX_CONFIG.keys())
-    idx = vrx_list.index(current_vrx)
     if direction == 'UP':
-        idx = (idx + 1) % len(vrx_list)
+        state.current = (state.current + 1) % len(state.receivers)
     else:
-        idx = (idx - 1) % len(vrx_list)
-    current_vrx = vrx_list[idx]
+        state.current = (state.current - 1) % len(state.receivers)
     update_display()
 
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Бинарный протокол UART для связи с наземной станцией.
+
+Кадры, CRC и диспетчеризация команд вынесены из vrx_controller.py: модуль
+не зависит от оборудования Raspberry Pi, поэтому его можно проверять на
+pty-паре (VRX_UART_PORT=/dev/pts/N).
+
+Кадр: A5 5A | тип | seq | длина | данные (0..255) | CRC16-CCITT (LE)
+CRC считается по байтам "тип..данные". Команды подтверждаются кадром
+ACK/NACK с эхом seq; повтор команды с тем же seq не исполняется повторно.
+"""
+
+import os
+import select
+import struct
+
+# pyserial нужен только для работы с реальным портом
+try:
+    import serial
+    SERIAL_AVAILABLE = True
+    print("Библиотека pyserial доступна")
+except ImportError:
+    SERIAL_AVAILABLE = False
+    print("Библиотека pyserial недоступна")
+
+UART_DEFAULT_PORT = '/dev/serial0'
+UART_BAUDRATE = 115200
+
+UART_SYNC = b'\xa5\x5a'
+UART_HEADER_LEN = 5
+UART_CRC_LEN = 2
+
+# Команды (станция -> контроллер)
+UART_CMD_TUNE = 0x01              # <H частота МГц (из сетки выбранного RX5808)
+UART_CMD_BAND = 0x02              # <BB диапазон, канал
+UART_CMD_VRX = 0x03               # <B индекс VRX, 0xFF - выключить и выйти в меню
+UART_CMD_SCAN = 0x04              # <B 1 - запустить автопоиск, 0 - остановить
+
+# Ответы и телеметрия (контроллер -> станция)
+UART_ACK = 0x80                   # <BB seq команды, тип команды
+UART_NACK = 0x81                  # <BBB seq команды, тип команды, код ошибки
+UART_TLM_RSSI = 0x90              # <B N, затем N x <HHB (сырое, фильтр, %)
+UART_TLM_STATUS = 0x91            # <BBBHB VRX, диапазон (0xFF - нет), канал, частота, флаги
+UART_TLM_SCAN = 0x92              # <B N, затем N x <BBB (диапазон, канал, %)
+
+UART_ERR_UNKNOWN = 1              # неизвестная команда
+UART_ERR_PAYLOAD = 2              # неверная длина/формат данных
+UART_ERR_RANGE = 3                # значение вне допустимого диапазона
+UART_ERR_STATE = 4                # команда недопустима в текущем состоянии
+UART_ERR_INTERNAL = 5             # исключение в обработчике команды
+
+UART_FLAG_AUTOSEARCH = 0x01
+UART_FLAG_TRACKING = 0x02
+
+UART_RSSI_PER_FRAME = 50          # 5 байт на отсчёт, укладываемся в 255
+UART_SCAN_PER_FRAME = 80          # 3 байта на канал
+UART_TX_LIMIT = 4096              # байт; при медленном канале телеметрия отбрасывается
+
+def _make_crc16_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+CRC16_TABLE = _make_crc16_table()
+
+def crc16_ccitt(data, crc=0xFFFF):
+    """CRC16-CCITT (полином 0x1021, начальное значение 0xFFFF)."""
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ CRC16_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+def encode_frame(msg_type, seq, payload=b''):
+    """Собрать кадр протокола."""
+    body = bytes((msg_type, seq, len(payload))) + payload
+    return UART_SYNC + body + struct.pack('<H', crc16_ccitt(body))
+
+def parse_frames(buffer):
+    """Извлечь целые кадры из buffer (bytearray, изменяется на месте).
+
+    Возвращает список (тип, seq, данные). Мусор между кадрами и кадры
+    с неверной CRC пропускаются, неполный хвост остаётся в буфере.
+    """
+    frames = []
+    while True:
+        start = buffer.find(UART_SYNC)
+        if start < 0:
+            # Последний байт может оказаться началом синхрослова
+            keep = 1 if buffer[-1:] == UART_SYNC[:1] else 0
+            del buffer[:len(buffer) - keep]
+            break
+        del buffer[:start]
+        if len(buffer) < UART_HEADER_LEN:
+            break
+        end = UART_HEADER_LEN + buffer[4]
+        if len(buffer) < end + UART_CRC_LEN:
+            break
+        body = bytes(buffer[2:end])
+        (crc,) = struct.unpack_from('<H', buffer, end)
+        if crc != crc16_ccitt(body):
+            # Ложная синхронизация: ищем следующее синхрослово
+            del buffer[:1]
+            continue
+        frames.append((body[0], body[1], body[3:]))
+        del buffer[:end + UART_CRC_LEN]
+    return frames
+
+def open_uart(port=None, baudrate=UART_BAUDRATE):
+    """Открыть порт без блокировок или вернуть None.
+
+    Порт по умолчанию берётся из VRX_UART_PORT (например, pty при
+    локальной отладке), иначе /dev/serial0.
+    """
+    if port is None:
+        port = os.environ.get('VRX_UART_PORT', UART_DEFAULT_PORT)
+    if not SERIAL_AVAILABLE:
+        return None
+    try:
+        # timeout=0 и write_timeout=0: чтение и запись не блокируют цикл
+        uart = serial.Serial(port, baudrate, timeout=0, write_timeout=0)
+        print(f"UART {port} открыт ({baudrate} бод)")
+        return uart
+    except Exception as e:
+        print(f"Ошибка открытия UART {port}: {e}")
+        return None
+
+class UartLink:
+    """Обмен кадрами по открытому порту: приём, ACK/NACK, очередь отправки.
+
+    commands - словарь {тип команды: обработчик(данные)}; обработчик
+    возвращает 0 или код ошибки UART_ERR_*.
+    """
+
+    __slots__ = ('port', 'commands', 'rx_buffer', 'tx_buffer', 'tx_seq',
+                 'last_cmd', 'last_reply')
+
+    def __init__(self, port, commands):
+        self.port = port
+        self.commands = commands
+        self.rx_buffer = bytearray()
+        self.tx_buffer = bytearray()
+        self.tx_seq = 0
+        self.last_cmd = None      # (seq, тип) последней исполненной команды
+        self.last_reply = b''     # ответ на неё (для повторов)
+
+    def send(self, msg_type, payload=b''):
+        """Поставить кадр в очередь на отправку."""
+        if len(self.tx_buffer) > UART_TX_LIMIT and msg_type not in (UART_ACK, UART_NACK):
+            return  # канал не успевает - телеметрию отбрасываем
+        self.tx_buffer.extend(encode_frame(msg_type, self.tx_seq, payload))
+        self.tx_seq = (self.tx_seq + 1) & 0xFF
+
+    def handle_frame(self, msg_type, seq, payload):
+        """Исполнить команду и ответить ACK/NACK."""
+        if (seq, msg_type) == self.last_cmd:
+            # Повтор (станция не получила ответ) - только переотправляем ответ
+            self.tx_buffer.extend(self.last_reply)
+            return
+        handler = self.commands.get(msg_type)
+        if handler is None:
+            error = UART_ERR_UNKNOWN
+        else:
+            try:
+                error = handler(payload)
+            except Exception as e:
+                # Станция получает NACK, остальные кадры обрабатываются дальше
+                print(f"Ошибка обработки команды 0x{msg_type:02X}: {e}")
+                error = UART_ERR_INTERNAL
+        start = len(self.tx_buffer)
+        if error:
+            self.send(UART_NACK, bytes((seq, msg_type, error)))
+        else:
+            self.send(UART_ACK, bytes((seq, msg_type)))
+        self.last_cmd = (seq, msg_type)
+        self.last_reply = bytes(self.tx_buffer[start:])
+
+    def receive(self):
+        """Прочитать всё, что пришло, и исполнить целые кадры."""
+        waiting = self.port.in_waiting
+        if waiting:
+            self.rx_buffer.extend(self.port.read(waiting))
+        for msg_type, seq, payload in parse_frames(self.rx_buffer):
+            self.handle_frame(msg_type, seq, payload)
+
+    def transmit(self):
+        """Отправить из очереди столько, сколько порт примет сейчас."""
+        # Пишем только если порт готов, иначе write() может ждать
+        if self.tx_buffer and select.select([], [self.port.fileno()], [], 0)[1]:
+            written = self.port.write(self.tx_buffer)
+            if written:
+                del self.tx_buffer[:written]
+
+    def close(self):
+        self.port.close()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Модель состояния контроллера VRX.
+
+Приёмники и состояние меню/автопоиска/слежения вынесены из
+vrx_controller.py: модуль не зависит от оборудования Raspberry Pi, поэтому
+его можно проверять без GPIO и SPI.
+
+Состояние хранится в объектах со __slots__: чтение в горячем цикле -
+обращение к слоту, а не поиск по словарю. Частоты и слова регистров
+RX5808 вычисляются один раз при создании приёмника.
+snapshot() возвращает неизменяемый снимок для дисплея и телеметрии;
+снимок приёмника кэшируется и пересоздаётся только после изменения
+(счётчик version), поэтому неизменившиеся приёмники разделяют снимок.
+"""
+
+from array import array
+from collections import namedtuple
+
+ReceiverSnapshot = namedtuple('ReceiverSnapshot', [
+    'version', 'name', 'type', 'frequency', 'index', 'channel',
+    'channel_count', 'band', 'band_name', 'rssi_raw', 'rssi_filtered',
+    'rssi_percent',
+])
+
+ControllerSnapshot = namedtuple('ControllerSnapshot', [
+    'app_state', 'current', 'active', 'autosearch_active',
+    'autosearch_total', 'tracking_active', 'receivers',
+])
+
+def rx5808_register_word(freq_mhz):
+    """Байты для записи частоты в синтезатор RX5808."""
+    # Формула: N = (freq - 479) / 2
+    N = (freq_mhz - 479) // 2
+    Nhigh = N >> 5
+    Nlow = N & 0x1F
+    data0 = (Nlow << 5) + 17   # в Arduino: Nlow * 32 + 17 (сдвиг влево на 5)
+    data1 = (Nhigh << 4) + (Nlow >> 3)  # Nhigh*16 + Nlow/8
+    data2 = Nhigh >> 4
+    data3 = 0
+    return (data0, data1, data2, data3)
+
+class Receiver:
+    """Общее состояние приёмника: конфигурация и текущий канал."""
+
+    __slots__ = ('name', 'type', 'power_pin', 'frequencies', 'index',
+                 'version', '_snapshot')
+
+    def __init__(self, name, vrx_type, power_pin, frequencies):
+        self.name = name
+        self.type = vrx_type
+        self.power_pin = power_pin
+        self.frequencies = array('H', frequencies)
+        self.index = 0
+        self.version = 0
+        self._snapshot = None
+
+    @property
+    def frequency(self):
+        return self.frequencies[self.index]
+
+    def select(self, index):
+        """Выбрать канал по индексу в общем списке частот."""
+        self.index = index
+        self.version += 1
+
+    def step(self, direction):
+        delta = 1 if direction == 'UP' else -1
+        self.select((self.index + delta) % len(self.frequencies))
+
+    def reset(self):
+        self.select(0)
+
+    def snapshot(self):
+        snap = self._snapshot
+        if snap is None or snap.version != self.version:
+            snap = self._snapshot = self._make_snapshot()
+        return snap
+
+    def _make_snapshot(self):
+        index = self.index
+        return ReceiverSnapshot(
+            self.version, self.name, self.type, self.frequencies[index],
+            index, index, len(self.frequencies), None, None, None, None, None)
+
+class StepReceiver(Receiver):
+    """Приёмник, переключаемый импульсами на пины CH_UP/CH_DOWN."""
+
+    __slots__ = ('up_pin', 'down_pin')
+
+    def __init__(self, name, vrx_type, power_pin, up_pin, down_pin, channels):
+        super().__init__(name, vrx_type, power_pin, channels)
+        self.up_pin = up_pin
+        self.down_pin = down_pin
+
+class Rx5808Receiver(Receiver):
+    """Приёмник на модуле RX5808: сетка диапазонов, настройка по SPI, RSSI."""
+
+    __slots__ = ('cs_pin', 'rssi_channel', 'band_names', 'band_start',
+                 'band_of', 'channel_of', 'registers',
+                 'rssi_raw', 'rssi_filtered', 'rssi_percent', 'rssi_min',
+                 'rssi_max', 'rssi_buffer', 'rssi_buffer_idx')
+
+    def __init__(self, name, vrx_type, power_pin, cs_pin, rssi_channel, bands):
+        super().__init__(name, vrx_type, power_pin,
+                         [freq for band_name, freqs in bands for freq in freqs])
+        self.cs_pin = cs_pin
+        self.rssi_channel = rssi_channel
+        # Плоская сетка: индекс -> (диапазон, канал) и обратно
+        self.band_names = tuple(band_name for band_name, freqs in bands)
+        band_start = []
+        band_of = []
+        channel_of = []
+        for band_idx, (band_name, freqs) in enumerate(bands):
+            band_start.append(len(band_of))
+            band_of.extend([band_idx] * len(freqs))
+            channel_of.extend(range(len(freqs)))
+        band_start.append(len(band_of))
+        self.band_start = tuple(band_start)
+        self.band_of = array('B', band_of)
+        self.channel_of = array('B', channel_of)
+        self.registers = tuple(rx5808_register_word(freq) for freq in self.frequencies)
+
+        self.rssi_raw = 0
+        self.rssi_filtered = 0
+        self.rssi_percent = 0
+        self.rssi_min = 50
+        self.rssi_max = 614
+        self.rssi_buffer = [0] * 5
+        self.rssi_buffer_idx = 0
+
+    @property
+    def band(self):
+        return self.band_of[self.index]
+
+    @property
+    def channel(self):
+        return self.channel_of[self.index]
+
+    def band_size(self, band_idx):
+        return self.band_start[band_idx + 1] - self.band_start[band_idx]
+
+    def index_of(self, band_idx, ch_idx):
+        return self.band_start[band_idx] + ch_idx
+
+    def step(self, direction):
+        """Следующий/предыдущий канал в пределах текущего диапазона."""
+        delta = 1 if direction == 'UP' else -1
+        band_idx = self.band_of[self.index]
+        ch_idx = (self.channel_of[self.index] + delta) % self.band_size(band_idx)
+        self.select(self.band_start[band_idx] + ch_idx)
+
+    def step_band(self, direction):
+        """Соседний диапазон, канал сбрасывается на первый."""
+        delta = 1 if direction == 'UP' else -1
+        band_idx = (self.band_of[self.index] + delta) % len(self.band_names)
+        self.select(self.band_start[band_idx])
+
+    def rssi_to_percent(self, value):
+        """Перевод значения АЦП в проценты по текущей калибровке."""
+        if self.rssi_max > self.rssi_min:
+            percent = int((value - self.rssi_min) * 100 / (self.rssi_max - self.rssi_min))
+            return max(0, min(100, percent))
+        return 0
+
+    def apply_rssi(self, raw, calibrate=True):
+        """Комбинированный фильтр (медиана + экспоненциальный) и автокалибровка."""
+        # Медианный фильтр на 5 отсчётов
+        buffer = self.rssi_buffer
+        buffer[self.rssi_buffer_idx] = raw
+        self.rssi_buffer_idx = (self.rssi_buffer_idx + 1) % 5
+        median = sorted(buffer)[2]
+        # Экспоненциальное сглаживание (alpha = 0.3)
+        filtered = int(0.3 * median + 0.7 * self.rssi_filtered)
+        # Автокалибровка min/max (как в Arduino)
+        if calibrate:
+            if filtered < self.rssi_min and filtered > 0:
+                self.rssi_min = filtered
+            if filtered > self.rssi_max and filtered <= 700:
+                self.rssi_max = filtered
+            if self.rssi_max - self.rssi_min < 50:
+                self.rssi_max = self.rssi_min + 50
+        self.rssi_raw = raw
+        self.rssi_filtered = filtered
+        self.rssi_percent = self.rssi_to_percent(filtered)
+        self.version += 1
+        return filtered
+
+    def seed_rssi(self, raw):
+        """Заполнить фильтр значением (после перестройки на другой канал)."""
+        self.rssi_buffer = [raw] * 5
+        self.rssi_raw = raw
+        self.rssi_filtered = raw
+        self.rssi_percent = self.rssi_to_percent(raw)
+        self.version += 1
+
+    def _make_snapshot(self):
+        index = self.index
+        band_idx = self.band_of[index]
+        return ReceiverSnapshot(
+            self.version, self.name, self.type, self.frequencies[index],
+            index, self.channel_of[index], self.band_size(band_idx),
+            band_idx, self.band_names[band_idx], self.rssi_raw,
+            self.rssi_filtered, self.rssi_percent)
+
+class ControllerState:
+    """Состояние контроллера: меню, выбранный приёмник, автопоиск, слежение."""
+
+    __slots__ = ('receivers', 'current', 'active', 'app_state',
+                 'autosearch_active', 'autosearch_best_rssi',
+                 'autosearch_best_index', 'autosearch_total',
+                 'autosearch_start_time',
+                 'tracking_active', 'tracking_receiver', 'tracking_candidates',
+                 'tracking_probe_idx', 'tracking_last_probe', 'tracking_wins',
+                 'tracking_ref_percent', 'tracking_budget',
+                 'tracking_budget_time')
+
+    def __init__(self, receivers):
+        self.receivers = tuple(receivers)
+        self.current = 0                 # индекс приёмника в меню
+        self.active = None               # индекс включённого приёмника
+        self.app_state = "vrx_select"    # "vrx_select" или "main"
+
+        self.autosearch_active = False
+        self.autosearch_best_rssi = -1
+        self.autosearch_best_index = 0
+        self.autosearch_total = 0
+        self.autosearch_start_time = 0
+
+        self.tracking_active = False
+        self.tracking_receiver = None    # индекс приёмника, за которым следим
+        self.tracking_candidates = []    # список (частота, индекс в сетке)
+        self.tracking_probe_idx = 0
+        self.tracking_last_probe = 0
+        self.tracking_wins = {}          # частота -> число побед подряд
+        self.tracking_ref_percent = 0    # медленное среднее уровня захваченного канала
+        self.tracking_budget = 0         # с, доступное время пропаданий
+        self.tracking_budget_time = 0
+
+    @property
+    def receiver(self):
+        return self.receivers[self.current]
+
+    def snapshot(self):
+        return ControllerSnapshot(
+            self.app_state, self.current, self.active, self.autosearch_active,
+            self.autosearch_total, self.tracking_active,
+            tuple(rx.snapshot() for rx in self.receivers))
+
+# ========== СЛЕЖЕНИЕ ЗА СИГНАЛОМ RX5808 ==========
+
+def build_tracking_candidates(rx, neighbour_mhz):
+    """Соседние частоты сетки в пределах neighbour_mhz от захваченного канала.
+
+    Возвращает список (частота, индекс в сетке), ближайшие - первыми.
+    Каналы разных диапазонов с одинаковой частотой (дубликаты) дают один
+    кандидат: пробовать одну и ту же частоту дважды бессмысленно.
+    """
+    locked_freq = rx.frequency
+    candidates = {}
+    for index, freq in enumerate(rx.frequencies):
+        if freq == locked_freq or abs(freq - locked_freq) > neighbour_mhz:
+            continue
+        if freq not in candidates:
+            candidates[freq] = (freq, index)
+    return sorted(candidates.values(), key=lambda c: abs(c[0] - locked_freq))
+
+def tracking_vote(wins, freq, probe_percent, locked_percent, hysteresis, confirm):
+    """Учесть пробу кандидата freq; True - пора переходить на него.
+
+    Проба выигрывает, если сильнее захваченного канала не меньше чем на
+    hysteresis процентов; probe_percent None (проба не удалась) - проигрыш.
+    wins ({частота: побед подряд}) изменяется на месте, проигрыш обнуляет
+    счёт. Переход - после confirm побед подряд.
+    """
+    if probe_percent is not None and probe_percent >= locked_percent + hysteresis:
+        wins[freq] = wins.get(freq, 0) + 1
+    else:
+        wins[freq] = 0
+    return wins[freq] >= confirm